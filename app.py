@@ -1,20 +1,86 @@
+import atexit
 import os
-from flask import Flask, jsonify, request
+import queue
+import re
+import threading
+import time
+from flask import Flask, g, has_request_context, jsonify, request
+from flask.json.provider import JSONProvider
+from flask_caching import Cache
+import orjson
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
+from werkzeug.http import http_date
 from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
 from bson import ObjectId
 from bson.regex import Regex
 import logging
-from datetime import datetime
+from datetime import date, datetime
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+gunicorn_logger = logging.getLogger("gunicorn.error")
+if gunicorn_logger.handlers:
+    # Running under gunicorn: reuse its handlers so lines are not formatted twice
+    logger.handlers = gunicorn_logger.handlers
+    logger.setLevel(gunicorn_logger.level)
+    logger.propagate = False
+else:
+    logging.basicConfig(level=logging.INFO)
 
 # 🔐 Load Mongo URI from GitHub/Jenkins secrets via environment variable
 MONGO_URI = os.getenv("MONGO_URI")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "student_db")
+
+# Optional asynchronous writes through a Celery worker (requires a Redis broker)
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
+ASYNC_WRITES_ENABLED = bool(CELERY_BROKER_URL)
+
+# Optional write coalescing: single inserts are buffered and flushed with one insert_many
+BULK_WRITE_ENABLED = os.getenv("BULK_WRITE_ENABLED", "false").lower() == "true"
+
+# Datetimes go through _json_default so they keep Flask's HTTP-date format
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson (C extension) instead of the stdlib json module"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_json_default, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def _json_default(obj):
+    """Serialize types orjson does not handle natively"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, date):
+        # Same format as Flask's default provider, e.g. "Thu, 15 Oct 2026 22:10:29 GMT"
+        return http_date(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def json_response(payload, status=200):
+    """Build a JSON response straight from orjson bytes, skipping the str round-trip"""
+    body = orjson.dumps(payload, default=_json_default, option=ORJSON_OPTIONS)
+    return app.response_class(body, status=status, mimetype="application/json")
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Short-TTL in-memory cache for read-heavy endpoints that tolerate seconds-stale data
+cache = Cache(app, config={"CACHE_TYPE": "SimpleCache", "CACHE_DEFAULT_TIMEOUT": 2})
+
+def ensure_indexes(collection):
+    """Create indexes used by the API (no-op if they already exist)"""
+    try:
+        # Covering index for name search: every returned field (_id, name, age) is in
+        # the index, so matches are answered from index keys without fetching documents.
+        # It uses the simple collation because collated string keys cannot cover a query.
+        collection.create_index([("name", 1), ("age", 1), ("_id", 1)], name="name_age_id")
+    except Exception as e:
+        logger.warning("⚠️ Could not create name index: %s", e)
 
 # Connect to MongoDB using secret URI with proper error handling
 def connect_to_mongodb():
@@ -24,22 +90,74 @@ def connect_to_mongodb():
         logger.info("💡 Add MONGO_URI to your GitHub Secrets or Jenkins Credentials")
         return None, None, None, False
     
+    client = None
     try:
         logger.info("🔗 Connecting to MongoDB using environment secret...")
-        client = MongoClient(MONGO_URI)
-        # Test the connection
+        # Single shared client with an explicit pool so every request reuses a warm socket
+        client = MongoClient(
+            MONGO_URI,
+            maxPoolSize=50,
+            minPoolSize=5,
+            maxIdleTimeMS=60000,
+            serverSelectionTimeoutMS=2000,
+            socketTimeoutMS=5000,
+            connectTimeoutMS=2000,
+            retryWrites=True
+        )
+        # Test the connection (also warms the pool before traffic arrives)
         client.admin.command('ping')
-        db = client["student_db"]
+        db = client[MONGO_DB_NAME]
         students_collection = db["students"]
+        ensure_indexes(students_collection)
         logger.info("✅ Successfully connected to MongoDB!")
         return client, db, students_collection, True
     except Exception as e:
-        logger.error(f"❌ MongoDB connection failed: {str(e)}")
+        logger.error("❌ MongoDB connection failed: %s", e)
         logger.warning("⚠️ Running in fallback mode without database")
+        if client is not None:
+            client.close()
         return None, None, None, False
 
-# Initialize database connection
-client, db, students_collection, DB_CONNECTED = connect_to_mongodb()
+# Database connection, created per process by _get_client().
+# PyMongo is not fork-safe, so the client must not be created at import time
+# and inherited by forked gunicorn/Celery workers.
+client = db = students_collection = None
+DB_CONNECTED = False
+_db_initialized = False
+_init_lock = threading.Lock()
+
+# Seconds to wait before retrying a failed connection, so an outage does not
+# make every request block on server selection
+DB_RETRY_INTERVAL = 5
+_next_connect_attempt = 0.0
+
+def _get_client():
+    """Initialize the database connection for this process if not already done"""
+    global client, db, students_collection, DB_CONNECTED, _db_initialized, _next_connect_attempt
+    # Fast path once initialized; the lock only guards concurrent first requests
+    if not _db_initialized and time.monotonic() >= _next_connect_attempt:
+        with _init_lock:
+            if not _db_initialized and time.monotonic() >= _next_connect_attempt:
+                client, db, students_collection, DB_CONNECTED = connect_to_mongodb()
+                if DB_CONNECTED or not MONGO_URI:
+                    # Final outcome: connected, or sample data mode by configuration
+                    _db_initialized = True
+                else:
+                    # MONGO_URI is set but the connect failed; retry on a later call
+                    _next_connect_attempt = time.monotonic() + DB_RETRY_INTERVAL
+    return client
+
+# Only the fields the API returns are pulled over the wire
+STUDENT_PROJECTION = {"name": 1, "age": 1}
+
+# Longest name accepted by the search endpoint, bounding regex work per query
+MAX_SEARCH_NAME_LENGTH = 128
+
+# Bulk insert limits (MongoDB rejects BSON documents over 16MB)
+MAX_BULK_STUDENTS = 1000
+MAX_BULK_BYTES = 16 * 1024 * 1024
+# Enforced by Werkzeug while reading the body, so chunked uploads are capped too
+app.config["MAX_CONTENT_LENGTH"] = MAX_BULK_BYTES
 
 # Fallback sample data when MongoDB secret is not available
 SAMPLE_STUDENTS = [
@@ -49,131 +167,353 @@ SAMPLE_STUDENTS = [
     {"_id": "4", "name": "Bob Wilson", "age": 21}
 ]
 
+# Lookup index over SAMPLE_STUDENTS: _id -> (lowercased name, student)
+SAMPLE_INDEX = {}
+
+def index_sample_student(student):
+    """Add a sample student to the lookup index"""
+    SAMPLE_INDEX[student["_id"]] = (student["name"].lower(), student)
+
+def reindex_sample_students():
+    """Rebuild the lookup index after SAMPLE_STUDENTS is replaced wholesale"""
+    SAMPLE_INDEX.clear()
+    for student in SAMPLE_STUDENTS:
+        index_sample_student(student)
+
+reindex_sample_students()
+
+def invalidate_student_cache():
+    """Drop cached student reads so writes are visible immediately"""
+    cache.delete('view//students')
+    cache.delete_memoized(get_student_count)
+
 def get_next_sample_id():
     """Generate next ID for sample data"""
     if not SAMPLE_STUDENTS:
         return "1"
     return str(max(int(s["_id"]) for s in SAMPLE_STUDENTS) + 1)
 
+def current_utcnow():
+    """UTC timestamp of the current request, or now when called outside a request (e.g. Celery)"""
+    if has_request_context() and "utcnow" in g:
+        return g.utcnow
+    return datetime.utcnow()
+
+class StudentWriteBuffer:
+    """Coalesce single-student inserts into insert_many calls from a background thread"""
+
+    def __init__(self, max_batch=500, max_wait=0.05):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def put(self, doc):
+        """Queue a document for the next bulk write"""
+        self._ensure_started()
+        self._queue.put(doc)
+
+    def flush(self):
+        """Block until every queued document has been written"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+        else:
+            # No writer thread to wait for (never started or died): write leftovers here
+            self._drain()
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.max_batch:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def _ensure_started(self):
+        # Started lazily so each forked worker runs its own flusher thread,
+        # and restarted if it died (e.g. GreenletExit or KeyboardInterrupt)
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="student-write-buffer", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            # Wait for the first document, then collect more until the batch is full or time runs out
+            batch = [self._queue.get()]
+            try:
+                deadline = time.monotonic() + self.max_wait
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+            finally:
+                # Write what was collected even if the thread is being torn down,
+                # so no dequeued document is left unacknowledged
+                self._write(batch)
+
+    def _write(self, batch):
+        try:
+            students_collection.insert_many(batch, ordered=False)
+            logger.info("📝 %d buffered students written to MongoDB", len(batch))
+            invalidate_student_cache()
+        except BulkWriteError as e:
+            failed_ids = [str(batch[error["index"]].get("_id")) for error in e.details.get("writeErrors", [])]
+            logger.error("❌ Bulk write dropped %d buffered students, _ids: %s", len(failed_ids), failed_ids)
+            invalidate_student_cache()
+        except Exception as e:
+            failed_ids = [str(doc.get("_id")) for doc in batch]
+            logger.exception("❌ Bulk write of %d buffered students failed, dropped _ids: %s (%s)", len(batch), failed_ids, e)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+student_write_buffer = StudentWriteBuffer()
+atexit.register(student_write_buffer.flush)
+
 # Database functions with GitHub/Jenkins secrets support
-def add_student(data):
+def add_student(data, student_id=None):
     """Add a new student using secure MongoDB connection"""
-    try:
-        student = {
-            "name": data["name"], 
-            "age": data["age"],
-            "created_at": datetime.utcnow()
-        }
-        
-        if DB_CONNECTED and students_collection is not None:
-            # Use secure MongoDB connection from secrets
-            result = students_collection.insert_one(student)
-            student["_id"] = str(result.inserted_id)
-            logger.info(f"📝 Student added to MongoDB: {student['name']}")
+    student = {
+        "name": data["name"], 
+        "age": data["age"],
+        "created_at": current_utcnow()
+    }
+    
+    if DB_CONNECTED and students_collection is not None:
+        # Use secure MongoDB connection from secrets
+        if student_id:
+            student["_id"] = ObjectId(student_id)
+        if BULK_WRITE_ENABLED:
+            # Assign the ID in-process and let the write buffer persist it
+            student.setdefault("_id", ObjectId())
+            student_write_buffer.put(student.copy())
+            logger.info("📝 Student buffered for MongoDB: %s", student["name"])
         else:
-            # Use fallback sample data
-            student["_id"] = get_next_sample_id()
-            student["created_at"] = student["created_at"].isoformat()
-            SAMPLE_STUDENTS.append(student.copy())
-            logger.info(f"📝 Student added to sample data: {student['name']}")
-        
-        return student
-    except Exception as e:
-        logger.error(f"❌ Error adding student: {str(e)}")
-        raise
+            students_collection.insert_one(student)
+            logger.info("📝 Student added to MongoDB: %s", student["name"])
+        student["_id"] = str(student["_id"])
+    else:
+        # Use fallback sample data
+        student["_id"] = get_next_sample_id()
+        student["created_at"] = student["created_at"].isoformat()
+        sample_student = student.copy()
+        SAMPLE_STUDENTS.append(sample_student)
+        index_sample_student(sample_student)
+        logger.info("📝 Student added to sample data: %s", student["name"])
+    
+    invalidate_student_cache()
+    return student
+
+def queue_student(data):
+    """Queue a new student for the Celery worker and return without waiting for MongoDB"""
+    from tasks import add_student_task
+    
+    # Assign the ID up front so the client can reference the student immediately
+    student_id = str(ObjectId())
+    add_student_task.delay({"name": data["name"], "age": data["age"]}, student_id)
+    logger.info("📨 Student queued for MongoDB: %s", data["name"])
+    return {"_id": student_id, "name": data["name"], "age": data["age"], "status": "queued"}
 
 def get_students():
     """Get all students with secure database handling"""
-    try:
-        if DB_CONNECTED and students_collection is not None:
-            # Use secure MongoDB connection from secrets
-            students = list(students_collection.find())
-            return [{"_id": str(student["_id"]), "name": student["name"], "age": student["age"]} 
-                   for student in students]
-        else:
-            # Use fallback sample data
-            return SAMPLE_STUDENTS.copy()
-    except Exception as e:
-        logger.error(f"❌ Error getting students: {str(e)}")
-        return SAMPLE_STUDENTS.copy()
+    if DB_CONNECTED and students_collection is not None:
+        # Use secure MongoDB connection from secrets
+        cursor = students_collection.find({}, projection=STUDENT_PROJECTION).batch_size(1000)
+        return [{"_id": str(student["_id"]), "name": student["name"], "age": student["age"]} 
+               for student in cursor]
+    else:
+        # Use fallback sample data (live list, callers must not mutate it)
+        return SAMPLE_STUDENTS
+
+@cache.memoize(timeout=5)
+def get_student_count():
+    """Get total number of students without fetching every document"""
+    if DB_CONNECTED and students_collection is not None:
+        # Metadata-based count, no collection scan
+        return students_collection.estimated_document_count()
+    else:
+        return len(SAMPLE_STUDENTS)
+
+def get_sample_student(student_id):
+    """Look up a fallback sample student by ID"""
+    entry = SAMPLE_INDEX.get(student_id)
+    return entry[1] if entry else None
 
 def get_student_by_id(student_id):
     """Get student by ID with secure database handling"""
-    try:
-        if DB_CONNECTED and students_collection is not None:
-            # Use secure MongoDB connection from secrets
-            student = students_collection.find_one({"_id": ObjectId(student_id)})
-            if student:
-                student["_id"] = str(student["_id"])
-            return student
-        else:
-            # Use fallback sample data
-            return next((s for s in SAMPLE_STUDENTS if s["_id"] == student_id), None)
-    except Exception as e:
-        logger.error(f"❌ Error getting student by ID {student_id}: {str(e)}")
-        return next((s for s in SAMPLE_STUDENTS if s["_id"] == student_id), None)
+    if DB_CONNECTED and students_collection is not None:
+        # Malformed IDs cannot match anything; skip the exception path
+        if not ObjectId.is_valid(student_id):
+            return None
+        # Use secure MongoDB connection from secrets
+        student = students_collection.find_one({"_id": ObjectId(student_id)})
+        if student:
+            student["_id"] = str(student["_id"])
+        return student
+    else:
+        # Use fallback sample data
+        return get_sample_student(student_id)
 
 def delete_student(student_id):
     """Delete student by ID with secure database handling"""
-    try:
-        if DB_CONNECTED and students_collection is not None:
-            # Use secure MongoDB connection from secrets
-            result = students_collection.delete_one({"_id": ObjectId(student_id)})
-            if result.deleted_count > 0:
-                return {"message": "Student deleted successfully"}
-            return {"error": "Student not found"}
-        else:
-            # Use fallback sample data
-            student_to_remove = next((s for s in SAMPLE_STUDENTS if s["_id"] == student_id), None)
-            if student_to_remove:
-                SAMPLE_STUDENTS.remove(student_to_remove)
-                return {"message": "Student deleted successfully"}
-            return {"error": "Student not found"}
-    except Exception as e:
-        logger.error(f"❌ Error deleting student {student_id}: {str(e)}")
-        return {"error": "Failed to delete student"}
+    if DB_CONNECTED and students_collection is not None:
+        # Malformed IDs cannot match anything; skip the exception path
+        if not ObjectId.is_valid(student_id):
+            return {"error": "Invalid student ID"}
+        # Use secure MongoDB connection from secrets
+        result = students_collection.delete_one({"_id": ObjectId(student_id)})
+        if result.deleted_count > 0:
+            invalidate_student_cache()
+            return {"message": "Student deleted successfully"}
+        return {"error": "Student not found"}
+    else:
+        # Use fallback sample data
+        student_to_remove = get_sample_student(student_id)
+        if student_to_remove:
+            SAMPLE_STUDENTS.remove(student_to_remove)
+            del SAMPLE_INDEX[student_id]
+            invalidate_student_cache()
+            return {"message": "Student deleted successfully"}
+        return {"error": "Student not found"}
+
+def search_sample_students(name, contains=False):
+    """Search fallback sample data by name prefix (or substring)"""
+    needle = name.lower()
+    if contains:
+        return [s for name_lower, s in SAMPLE_INDEX.values() if needle in name_lower]
+    return [s for name_lower, s in SAMPLE_INDEX.values() if name_lower.startswith(needle)]
+
+def search_students_by_name(name, contains=False):
+    """Search students by name prefix (or substring) with secure database handling"""
+    if DB_CONNECTED and students_collection is not None:
+        # The regex is evaluated against the name_age_id index keys (a covered, index-only
+        # scan). Unanchored regexes already match anywhere, so no leading/trailing ".*".
+        escaped = re.escape(name)
+        pattern = Regex(escaped if contains else f"^{escaped}", "i")
+        students = students_collection.find(
+            {"name": pattern},
+            projection=STUDENT_PROJECTION
+        ).batch_size(1000)
+        return [{"_id": str(student["_id"]), "name": student["name"], "age": student["age"]} 
+               for student in students]
+    else:
+        # Use fallback sample data with simple search
+        return search_sample_students(name, contains)
+
+def add_students_bulk(items):
+    """Add many students in a single database round-trip"""
+    created_at = current_utcnow()
+    docs = [{"name": item["name"], "age": item["age"], "created_at": created_at} for item in items]
+    
+    if DB_CONNECTED and students_collection is not None:
+        # One insert_many call instead of N insert_one round-trips
+        try:
+            result = students_collection.insert_many(docs, ordered=False, bypass_document_validation=False)
+        except BulkWriteError as e:
+            # ordered=False keeps going past failures, so the other documents were written
+            failed_indexes = sorted(error["index"] for error in e.details.get("writeErrors", []))
+            failed = set(failed_indexes)
+            ids = [str(doc["_id"]) for index, doc in enumerate(docs) if index not in failed]
+            logger.error("❌ Bulk insert partially failed, student indexes: %s", failed_indexes)
+            invalidate_student_cache()
+            return {"inserted": e.details.get("nInserted", len(ids)), "ids": ids, "failed_indexes": failed_indexes}
+        ids = [str(inserted_id) for inserted_id in result.inserted_ids]
+        logger.info("📝 %d students added to MongoDB", len(ids))
+    else:
+        # Use fallback sample data
+        next_id = int(get_next_sample_id())
+        ids = [str(next_id + i) for i in range(len(docs))]
+        new_students = [
+            {**doc, "_id": student_id, "created_at": created_at.isoformat()}
+            for doc, student_id in zip(docs, ids)
+        ]
+        SAMPLE_STUDENTS.extend(new_students)
+        for student in new_students:
+            index_sample_student(student)
+        logger.info("📝 %d students added to sample data", len(ids))
+    
+    invalidate_student_cache()
+    return {"inserted": len(ids), "ids": ids}
 
-def search_students_by_name(name):
-    """Search students by name with secure database handling"""
+def validate_student_data(data):
+    """Validate and normalize a student payload, returning an error message or None"""
+    if "name" not in data or "age" not in data:
+        return "Missing required fields: 'name' and 'age'"
+    
+    # Validate age
     try:
-        if DB_CONNECTED and students_collection is not None:
-            # Use secure MongoDB connection from secrets with regex search
-            students = students_collection.find({"name": {"$regex": f".*{name}.*", "$options": "i"}})
-            return [{"_id": str(student["_id"]), "name": student["name"], "age": student["age"]} 
-                   for student in students]
-        else:
-            # Use fallback sample data with simple search
-            return [s for s in SAMPLE_STUDENTS if name.lower() in s["name"].lower()]
-    except Exception as e:
-        logger.error(f"❌ Error searching students by name {name}: {str(e)}")
-        return [s for s in SAMPLE_STUDENTS if name.lower() in s["name"].lower()]
+        age = int(data["age"])
+        if age < 0 or age > 150:
+            return "Age must be between 0 and 150"
+        data["age"] = age
+    except (ValueError, TypeError):
+        return "Age must be a valid number"
+    
+    # Validate name
+    if not isinstance(data["name"], str):
+        return "Name must be a string"
+    if not data["name"].strip():
+        return "Name cannot be empty"
+    
+    return None
 
 # Flask routes
+@app.before_request
+def ensure_db_connection():
+    """Connect lazily on the first request when no startup hook has done it"""
+    _get_client()
+
+@app.before_request
+def stamp_request_time():
+    """Capture one UTC timestamp per request for responses and new documents"""
+    g.utcnow = datetime.utcnow()
+    g.utcnow_iso = g.utcnow.isoformat()
+
+# Parts of the home page that never change, encoded once at startup
+_HOME_STATIC = {
+    "message": "Welcome to the Student Management System API!",
+    "status": "operational",
+    "secret_configured": bool(MONGO_URI),
+    "endpoints": {
+        "GET /students": "Get all students",
+        "POST /students": "Add new student (requires: name, age)",
+        "POST /students/bulk": "Add many students (list of name, age)",
+        "GET /students/{id}": "Get student by ID",
+        "DELETE /students/{id}": "Delete student by ID", 
+        "GET /students/name/{name}": "Search students by name prefix (?match=contains for substring)",
+        "GET /health": "Health check for CI/CD monitoring"
+    }
+}
+# Static fields without the opening brace, ready to append after the dynamic ones
+_HOME_STATIC_SUFFIX = b"," + orjson.dumps(_HOME_STATIC)[1:]
+
 @app.route('/')
 def home():
     """Home page with system status and secret configuration info"""
     try:
         db_status = "Connected via GitHub/Jenkins Secrets" if DB_CONNECTED else "Using Sample Data (No MongoDB Secret)"
-        total_students = len(get_students())
-        
-        return jsonify({
-            "message": "Welcome to the Student Management System API!",
-            "status": "operational",
+        dynamic = orjson.dumps({
             "database_status": db_status,
-            "total_students": total_students,
-            "secret_configured": bool(MONGO_URI),
-            "timestamp": datetime.utcnow().isoformat(),
-            "endpoints": {
-                "GET /students": "Get all students",
-                "POST /students": "Add new student (requires: name, age)",
-                "GET /students/{id}": "Get student by ID",
-                "DELETE /students/{id}": "Delete student by ID", 
-                "GET /students/name/{name}": "Search students by name",
-                "GET /health": "Health check for CI/CD monitoring"
-            }
-        }), 200
+            "total_students": get_student_count(),
+            "timestamp": g.utcnow_iso
+        })
+        # Splice the pre-encoded static fields into the dynamic object
+        body = dynamic[:-1] + _HOME_STATIC_SUFFIX
+        return app.response_class(body, status=200, mimetype="application/json")
     except Exception as e:
-        logger.error(f"❌ Error in home route: {str(e)}")
+        logger.exception("❌ Error in home route: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
 @app.route('/health')
@@ -191,17 +531,17 @@ def health_check():
             "status": "healthy",
             "database": db_status,
             "mongo_secret_configured": bool(MONGO_URI),
-            "timestamp": datetime.utcnow().isoformat(),
-            "total_students": len(get_students()),
+            "timestamp": g.utcnow_iso,
+            "total_students": get_student_count(),
             "ready_for_deployment": True
         }), 200
     except Exception as e:
-        logger.error(f"❌ Health check failed: {str(e)}")
+        logger.error("❌ Health check failed: %s", e)
         return jsonify({
             "status": "healthy_with_fallback",
             "database": "fallback_mode",
             "error": str(e),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": g.utcnow_iso
         }), 200  # Still return 200 for CI/CD pipeline
 
 @app.route('/students', methods=['POST'])
@@ -212,37 +552,60 @@ def add():
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
         
-        if "name" not in data or "age" not in data:
-            return jsonify({"error": "Missing required fields: 'name' and 'age'"}), 400
-        
-        # Validate age
-        try:
-            age = int(data["age"])
-            if age < 0 or age > 150:
-                return jsonify({"error": "Age must be between 0 and 150"}), 400
-            data["age"] = age
-        except (ValueError, TypeError):
-            return jsonify({"error": "Age must be a valid number"}), 400
+        error = validate_student_data(data)
+        if error:
+            return jsonify({"error": error}), 400
         
-        # Validate name
-        if not data["name"].strip():
-            return jsonify({"error": "Name cannot be empty"}), 400
+        if ASYNC_WRITES_ENABLED and DB_CONNECTED:
+            return jsonify(queue_student(data)), 202
         
         student = add_student(data)
         return jsonify(student), 201
+    except RequestEntityTooLarge:
+        # Body over MAX_CONTENT_LENGTH; answered by the 413 handler
+        raise
     except Exception as e:
-        logger.error(f"❌ Error adding student: {str(e)}")
+        logger.exception("❌ Error adding student: %s", e)
         return jsonify({"error": "Failed to add student"}), 500
 
+@app.route('/students/bulk', methods=['POST'])
+def add_bulk():
+    """Add many students at once with validation"""
+    try:
+        items = request.get_json()
+        if not items or not isinstance(items, list):
+            return jsonify({"error": "Expected a non-empty JSON list of students"}), 400
+        
+        if len(items) > MAX_BULK_STUDENTS:
+            return jsonify({"error": f"Cannot add more than {MAX_BULK_STUDENTS} students at once"}), 400
+        
+        for index, item in enumerate(items):
+            error = validate_student_data(item) if isinstance(item, dict) else "Student must be a JSON object"
+            if error:
+                return jsonify({"error": f"Student at index {index}: {error}"}), 400
+        
+        result = add_students_bulk(items)
+        # 207 Multi-Status when only part of the batch was written
+        return jsonify(result), 207 if result.get("failed_indexes") else 201
+    except RequestEntityTooLarge:
+        # Body over MAX_CONTENT_LENGTH; answered by the 413 handler
+        raise
+    except Exception as e:
+        logger.exception("❌ Error adding students in bulk: %s", e)
+        return jsonify({"error": "Failed to add students"}), 500
+
 @app.route('/students', methods=['GET'])
+# Only successful responses are cached so a transient error is not replayed
+@cache.cached(timeout=2, response_filter=lambda response: response.status_code == 200)
 def get_all():
     """Get all students"""
     try:
         students = get_students()
-        return jsonify(students), 200
+        return json_response(students)
     except Exception as e:
-        logger.error(f"❌ Error getting students: {str(e)}")
-        return jsonify({"error": "Failed to retrieve students"}), 500
+        logger.exception("❌ Error getting students: %s", e)
+        # A Response object (not a tuple) so the cache's response_filter can inspect it
+        return json_response({"error": "Failed to retrieve students"}, status=500)
 
 @app.route('/students/<string:student_id>', methods=['GET'])
 def get_by_id(student_id):
@@ -253,7 +616,7 @@ def get_by_id(student_id):
             return jsonify(student), 200
         return jsonify({"error": "Student not found"}), 404
     except Exception as e:
-        logger.error(f"❌ Error getting student {student_id}: {str(e)}")
+        logger.exception("❌ Error getting student %s: %s", student_id, e)
         return jsonify({"error": "Failed to retrieve student"}), 500
 
 @app.route('/students/<string:student_id>', methods=['DELETE'])
@@ -265,35 +628,66 @@ def delete(student_id):
             return jsonify(result), 404
         return jsonify(result), 200
     except Exception as e:
-        logger.error(f"❌ Error deleting student {student_id}: {str(e)}")
+        logger.exception("❌ Error deleting student %s: %s", student_id, e)
         return jsonify({"error": "Failed to delete student"}), 500
 
 @app.route('/students/name/<string:name>', methods=['GET'])
 def get_by_name(name):
     """Search students by name using secure database"""
     try:
-        students_list = search_students_by_name(name)
+        if len(name) > MAX_SEARCH_NAME_LENGTH:
+            return jsonify({"error": f"Name must be at most {MAX_SEARCH_NAME_LENGTH} characters"}), 400
+        
+        contains = request.args.get("match") == "contains"
+        students_list = search_students_by_name(name, contains)
         if students_list:
-            return jsonify(students_list), 200
+            return json_response(students_list)
         return jsonify({"error": "No students found with the given name"}), 404
     except Exception as e:
-        logger.error(f"❌ Error searching students by name {name}: {str(e)}")
+        logger.exception("❌ Error searching students by name %s: %s", name, e)
         return jsonify({"error": "Failed to search students"}), 500
 
+@app.after_request
+def add_http_cache_headers(response):
+    """Let pollers revalidate the student list and briefly cache health checks"""
+    if request.method == "GET" and response.status_code == 200:
+        if request.path == "/students":
+            # Content-based ETag: unchanged lists become 304 Not Modified with no body
+            response.add_etag()
+            response.make_conditional(request)
+        elif request.path == "/health":
+            response.cache_control.public = True
+            response.cache_control.max_age = 2
+    return response
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({"error": "Endpoint not found"}), 404
 
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({"error": "Request body too large"}), 413
+
 @app.errorhandler(500)
 def internal_error(error):
-    logger.error(f"❌ Internal server error: {str(error)}")
+    logger.error("❌ Internal server error: %s", error)
+    return jsonify({"error": "Internal server error"}), 500
+
+@app.errorhandler(Exception)
+def unhandled_exception(error):
+    # Leave HTTP errors (404, 405, ...) to Flask's normal handling
+    if isinstance(error, HTTPException):
+        return error
+    logger.exception("❌ Unhandled error: %s", error)
     return jsonify({"error": "Internal server error"}), 500
 
 if __name__ == '__main__':
     logger.info("🚀 Starting Student Management System...")
-    logger.info(f"🔐 MongoDB Secret Status: {'Configured' if MONGO_URI else 'Not Configured'}")
-    logger.info(f"📊 Database Status: {'Connected' if DB_CONNECTED else 'Sample Data Mode'}")
+    _get_client()
+    logger.info("🔐 MongoDB Secret Status: %s", "Configured" if MONGO_URI else "Not Configured")
+    logger.info("📊 Database Status: %s", "Connected" if DB_CONNECTED else "Sample Data Mode")
     logger.info("🌐 Server starting on http://0.0.0.0:5000")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only; production runs under gunicorn (see gunicorn_conf.py)
+    app.run(debug=False, threaded=True, host='0.0.0.0', port=5000)
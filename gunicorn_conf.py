@@ -0,0 +1,35 @@
+import multiprocessing
+import os
+
+# Gunicorn configuration for production deployments
+# Usage: gunicorn -c gunicorn_conf.py app:app
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# gevent workers yield to other requests while waiting on MongoDB sockets.
+# The gevent worker monkey-patches the standard library before importing the app.
+worker_class = "gevent"
+if os.getenv("MONGO_URI"):
+    workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+else:
+    # Sample data mode keeps students in process memory, so every request
+    # must hit the same worker to see a consistent list.
+    workers = 1
+worker_connections = 1000
+keepalive = 5
+timeout = 30
+
+# Do not preload the app: PyMongo clients are not fork-safe, so each worker
+# imports the app (and opens its own connection pool) after forking.
+preload_app = False
+
+def post_worker_init(worker):
+    """Open this worker's own MongoDB connection pool after forking"""
+    # Runs after the gevent worker has monkey-patched and loaded the app;
+    # post_fork would import pymongo (and ssl) before patching.
+    import app
+    app._get_client()
+
+accesslog = "-"
+errorlog = "-"
+loglevel = "info"
@@ -0,0 +1,37 @@
+import os
+from celery import Celery
+from celery.signals import worker_process_init
+
+import app as app_module
+from app import _get_client, add_student
+
+# Celery worker for asynchronous student writes
+# Usage: celery -A tasks worker --loglevel=info
+celery_app = Celery(
+    "student_tasks",
+    broker=os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+)
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Open this worker process's own MongoDB connection pool after forking"""
+    _get_client()
+
+# Retry until MongoDB is reachable; acks_late keeps the message on the broker
+# until the write has actually happened
+@celery_app.task(
+    name="students.add",
+    autoretry_for=(ConnectionError,),
+    retry_backoff=True,
+    retry_backoff_max=300,
+    max_retries=None,
+    acks_late=True,
+)
+def add_student_task(data, student_id):
+    """Persist a queued student using the ID already returned to the client"""
+    # worker_process_init only fires for the prefork/solo pools; connect here too
+    # so thread, gevent and eventlet pools never fall back to in-memory sample data
+    _get_client()
+    if not app_module.DB_CONNECTED:
+        raise ConnectionError("MongoDB is not connected")
+    add_student(data, student_id)
@@ -2,11 +2,17 @@ import pytest
 import json
 import os
 import sys
+import threading
 
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, students_collection, DB_CONNECTED, SAMPLE_STUDENTS
+# Give each test process (and pytest-xdist worker) its own database so tests
+# never touch real data and parallel workers do not wipe each other's students
+os.environ["MONGO_DB_NAME"] = f"student_db_test_{os.getpid()}_{os.getenv('PYTEST_XDIST_WORKER', 'main')}"
+
+import app as app_module
+from app import app, cache, SAMPLE_STUDENTS, _get_client, ensure_indexes, reindex_sample_students
 
 @pytest.fixture
 def client():
@@ -15,12 +21,21 @@ def client():
     with app.test_client() as client:
         yield client
 
+@pytest.fixture(scope='session', autouse=True)
+def db_client():
+    """Connect to MongoDB once for the whole test session"""
+    client = _get_client()
+    yield client
+    if client is not None:
+        client.drop_database(app_module.MONGO_DB_NAME)
+
 @pytest.fixture(autouse=True)
-def cleanup_db():
+def cleanup_db(db_client):
     """Clean up test data before each test"""
-    if DB_CONNECTED and students_collection is not None:
-        # Clean up MongoDB if connected
-        students_collection.delete_many({})
+    if app_module.DB_CONNECTED and app_module.students_collection is not None:
+        # Clean up MongoDB if connected (dropping is faster than deleting every document)
+        app_module.db.drop_collection('students')
+        ensure_indexes(app_module.students_collection)
     else:
         # Clean up sample data
         SAMPLE_STUDENTS.clear()
@@ -29,6 +44,36 @@ def cleanup_db():
             {"_id": "1", "name": "Test User", "age": 20},
             {"_id": "2", "name": "Alice Test", "age": 22}
         ])
+        reindex_sample_students()
+    # Drop cached reads left over from the previous test
+    cache.clear()
+
+@pytest.fixture
+def recording_collection(monkeypatch):
+    """Stand-in students collection that records the documents written to it"""
+    class RecordingCollection:
+        def __init__(self):
+            self.batches = []
+            self.ordered = []
+            # Exception to raise from the next insert_many, and the thread it was raised in
+            self.fail_next = None
+            self.failed_thread = None
+
+        @property
+        def documents(self):
+            return [doc for batch in self.batches for doc in batch]
+
+        def insert_many(self, documents, ordered=True):
+            if self.fail_next is not None:
+                error, self.fail_next = self.fail_next, None
+                self.failed_thread = threading.current_thread()
+                raise error
+            self.batches.append(list(documents))
+            self.ordered.append(ordered)
+
+    collection = RecordingCollection()
+    monkeypatch.setattr(app_module, 'students_collection', collection)
+    return collection
 
 # Basic endpoint tests
 def test_home_page(client):
@@ -40,6 +85,9 @@ def test_home_page(client):
     assert 'Student Management System' in data['message']
     assert 'status' in data
     assert data['status'] == 'operational'
+    assert 'GET /students' in data['endpoints']
+    assert isinstance(data['total_students'], int)
+    assert 'timestamp' in data
 
 def test_health_check(client):
     """Test the health check endpoint for CI/CD monitoring."""
@@ -51,6 +99,18 @@ def test_health_check(client):
     assert 'database' in data
     assert 'mongo_secret_configured' in data
     assert 'ready_for_deployment' in data
+    assert response.headers['Cache-Control'] == 'public, max-age=2'
+
+def test_student_count_tracks_writes(client):
+    """Test that home and health report the student count after a write."""
+    before = json.loads(client.get('/health').data)['total_students']
+    add_response = client.post('/students',
+                              data=json.dumps({'name': 'Count Test', 'age': 30}),
+                              content_type='application/json')
+    assert add_response.status_code == 201
+
+    assert json.loads(client.get('/health').data)['total_students'] == before + 1
+    assert json.loads(client.get('/').data)['total_students'] == before + 1
 
 def test_get_all_students(client):
     """Test getting all students."""
@@ -59,6 +119,52 @@ def test_get_all_students(client):
     data = json.loads(response.data)
     assert isinstance(data, list)
 
+def test_get_all_students_error_not_cached(client, monkeypatch):
+    """Test that a failed student list read is not served from the cache."""
+    original = app_module.get_students
+
+    def fail():
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(app_module, 'get_students', fail)
+    response = client.get('/students')
+    assert response.status_code == 500
+    assert json.loads(response.data) == {'error': 'Failed to retrieve students'}
+
+    monkeypatch.setattr(app_module, 'get_students', original)
+    response = client.get('/students')
+    assert response.status_code == 200
+    assert isinstance(json.loads(response.data), list)
+
+def test_get_all_students_reflects_new_student(client):
+    """Test that adding a student invalidates the cached student list."""
+    before = json.loads(client.get('/students').data)
+    add_response = client.post('/students',
+                              data=json.dumps({'name': 'Cache Test', 'age': 24}),
+                              content_type='application/json')
+    assert add_response.status_code == 201
+
+    after = json.loads(client.get('/students').data)
+    assert len(after) == len(before) + 1
+    assert any(student['name'] == 'Cache Test' for student in after)
+
+def test_get_all_students_conditional(client):
+    """Test that an unchanged student list returns 304 Not Modified."""
+    response = client.get('/students')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    response = client.get('/students', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    client.post('/students',
+                data=json.dumps({'name': 'ETag Test', 'age': 23}),
+                content_type='application/json')
+    response = client.get('/students', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
 def test_add_student_valid(client):
     """Test adding a valid student."""
     student_data = {
@@ -74,6 +180,99 @@ def test_add_student_valid(client):
     assert data['age'] == 25
     assert '_id' in data
 
+def test_add_student_async_queued(client, monkeypatch):
+    """Test that POST /students is queued when asynchronous writes are enabled."""
+    import tasks
+
+    queued = []
+    monkeypatch.setattr(app_module, 'ASYNC_WRITES_ENABLED', True)
+    monkeypatch.setattr(app_module, 'DB_CONNECTED', True)
+    monkeypatch.setattr(tasks.add_student_task, 'delay', lambda *args: queued.append(args))
+
+    response = client.post('/students',
+                          data=json.dumps({'name': 'Queued Student', 'age': 26}),
+                          content_type='application/json')
+    assert response.status_code == 202
+    data = json.loads(response.data)
+    assert data['status'] == 'queued'
+    assert queued == [({'name': 'Queued Student', 'age': 26}, data['_id'])]
+
+def test_student_write_buffer_coalesces_inserts(recording_collection):
+    """Test that buffered inserts are flushed together with one insert_many."""
+    buffer = app_module.StudentWriteBuffer(max_batch=500, max_wait=0.5)
+    for i in range(3):
+        buffer.put({'name': f'Buffered {i}', 'age': 20 + i})
+    buffer.flush()
+
+    assert len(recording_collection.batches) == 1
+    assert [doc['name'] for doc in recording_collection.documents] == ['Buffered 0', 'Buffered 1', 'Buffered 2']
+    assert recording_collection.ordered == [False]
+
+def test_add_student_task_connects_first(monkeypatch):
+    """Test that the Celery task connects to MongoDB before writing."""
+    import tasks
+
+    calls = []
+    monkeypatch.setattr(app_module, 'DB_CONNECTED', True)
+    monkeypatch.setattr(tasks, '_get_client', lambda: calls.append('connect'))
+    monkeypatch.setattr(tasks, 'add_student', lambda data, student_id: calls.append(('add', student_id)))
+
+    tasks.add_student_task({'name': 'Task Student', 'age': 22}, 'abc')
+    assert calls == ['connect', ('add', 'abc')]
+
+def test_add_student_task_requires_database(monkeypatch):
+    """Test that the Celery task raises instead of writing to sample data."""
+    import tasks
+
+    calls = []
+    monkeypatch.setattr(app_module, 'DB_CONNECTED', False)
+    monkeypatch.setattr(tasks, '_get_client', lambda: None)
+    monkeypatch.setattr(tasks, 'add_student', lambda data, student_id: calls.append(student_id))
+
+    with pytest.raises(ConnectionError):
+        tasks.add_student_task({'name': 'Task Student', 'age': 22}, 'abc')
+    assert calls == []
+    assert ConnectionError in tasks.add_student_task.autoretry_for
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_student_write_buffer_restarts_dead_thread(recording_collection):
+    """Test that a dead writer thread is restarted and flush does not hang."""
+    buffer = app_module.StudentWriteBuffer(max_wait=0.01)
+
+    # SystemExit is not caught by the writer, so it kills the flusher thread
+    recording_collection.fail_next = SystemExit()
+    buffer.put({'name': 'Lost', 'age': 20})
+    buffer.flush()
+    recording_collection.failed_thread.join(timeout=5)
+    assert not recording_collection.failed_thread.is_alive()
+
+    # Nothing left to wait for: flush returns instead of blocking on the dead writer
+    buffer.flush()
+
+    # A new put restarts the writer thread
+    buffer.put({'name': 'Restarted', 'age': 21})
+    buffer.flush()
+    assert [doc['name'] for doc in recording_collection.documents] == ['Restarted']
+
+def test_add_student_buffered_write(client, monkeypatch, recording_collection):
+    """Test that POST /students with BULK_WRITE_ENABLED returns the buffered document's _id."""
+    buffer = app_module.StudentWriteBuffer(max_wait=0.01)
+    monkeypatch.setattr(app_module, 'BULK_WRITE_ENABLED', True)
+    monkeypatch.setattr(app_module, 'DB_CONNECTED', True)
+    monkeypatch.setattr(app_module, 'student_write_buffer', buffer)
+
+    response = client.post('/students',
+                          data=json.dumps({'name': 'Buffered Student', 'age': 24}),
+                          content_type='application/json')
+    assert response.status_code == 201
+    data = json.loads(response.data)
+    buffer.flush()
+
+    documents = recording_collection.documents
+    assert len(documents) == 1
+    assert str(documents[0]['_id']) == data['_id']
+    assert documents[0]['name'] == 'Buffered Student'
+
 def test_add_student_missing_name(client):
     """Test adding a student with missing name."""
     student_data = {
@@ -139,6 +338,93 @@ def test_add_student_empty_name(client):
     data = json.loads(response.data)
     assert 'error' in data
 
+def test_add_students_bulk_valid(client):
+    """Test adding several students in one request."""
+    students_data = [
+        {'name': 'Bulk One', 'age': 20},
+        {'name': 'Bulk Two', 'age': 21}
+    ]
+    response = client.post('/students/bulk',
+                          data=json.dumps(students_data),
+                          content_type='application/json')
+    assert response.status_code == 201
+    data = json.loads(response.data)
+    assert data['inserted'] == 2
+    assert len(data['ids']) == 2
+
+    response = client.get('/students/name/Bulk')
+    assert response.status_code == 200
+    assert len(json.loads(response.data)) == 2
+
+def test_add_students_bulk_invalid_item(client):
+    """Test that one invalid student rejects the whole batch."""
+    students_data = [
+        {'name': 'Bulk Valid', 'age': 20},
+        {'name': 'Bulk Invalid', 'age': -1}
+    ]
+    response = client.post('/students/bulk',
+                          data=json.dumps(students_data),
+                          content_type='application/json')
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert 'index 1' in data['error']
+
+    response = client.get('/students/name/Bulk')
+    assert response.status_code == 404
+
+def test_add_students_bulk_non_string_name(client):
+    """Test that a non-string name is a 400 naming the bad index."""
+    response = client.post('/students/bulk',
+                          data=json.dumps([{'name': 'Fine', 'age': 20}, {'name': 5, 'age': 2}]),
+                          content_type='application/json')
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert data['error'] == 'Student at index 1: Name must be a string'
+
+def test_add_students_bulk_not_a_list(client):
+    """Test that the bulk endpoint requires a JSON list."""
+    response = client.post('/students/bulk',
+                          data=json.dumps({'name': 'Not A List', 'age': 20}),
+                          content_type='application/json')
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert 'error' in data
+
+def test_add_students_bulk_partial_failure(client, monkeypatch):
+    """Test that a partially failed bulk insert reports what was written."""
+    from bson import ObjectId
+    from pymongo.errors import BulkWriteError
+
+    class PartialCollection:
+        def insert_many(self, docs, **kwargs):
+            for doc in docs:
+                doc['_id'] = ObjectId()
+            raise BulkWriteError({'writeErrors': [{'index': 1}], 'nInserted': 1})
+
+    monkeypatch.setattr(app_module, 'DB_CONNECTED', True)
+    monkeypatch.setattr(app_module, 'students_collection', PartialCollection())
+
+    students_data = [{'name': 'Bulk Ok', 'age': 20}, {'name': 'Bulk Fails', 'age': 21}]
+    response = client.post('/students/bulk',
+                          data=json.dumps(students_data),
+                          content_type='application/json')
+    assert response.status_code == 207
+    data = json.loads(response.data)
+    assert data['inserted'] == 1
+    assert data['failed_indexes'] == [1]
+    assert len(data['ids']) == 1
+
+def test_request_body_too_large(client, monkeypatch):
+    """Test that oversized bodies are rejected with 413 on every write endpoint."""
+    monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 10)
+    for url, payload in [('/students/bulk', [{'name': 'Too Large', 'age': 20}]),
+                         ('/students', {'name': 'Too Large', 'age': 20})]:
+        response = client.post(url,
+                              data=json.dumps(payload),
+                              content_type='application/json')
+        assert response.status_code == 413
+        assert json.loads(response.data) == {'error': 'Request body too large'}
+
 def test_get_student_by_id_sample_data(client):
     """Test getting a student by ID using sample data."""
     # This test works with both MongoDB and sample data
@@ -181,6 +467,19 @@ def test_delete_student_sample_data(client):
         # If not found, should return 404
         assert delete_response.status_code == 404
 
+def test_deleted_student_not_retrievable(client):
+    """Test that a deleted student can no longer be fetched or found."""
+    add_response = client.post('/students',
+                              data=json.dumps({'name': 'Gone Soon', 'age': 33}),
+                              content_type='application/json')
+    assert add_response.status_code == 201
+    student_id = json.loads(add_response.data)['_id']
+
+    assert client.get(f'/students/{student_id}').status_code == 200
+    assert client.delete(f'/students/{student_id}').status_code == 200
+    assert client.get(f'/students/{student_id}').status_code == 404
+    assert client.get('/students/name/Gone').status_code == 404
+
 def test_delete_student_not_found(client):
     """Test deleting a non-existent student."""
     response = client.delete('/students/999999')
@@ -229,6 +528,38 @@ def test_search_students_by_partial_name(client):
     assert isinstance(data, list)
     assert len(data) > 0
 
+def test_search_students_by_substring(client):
+    """Test searching students by a substring requires match=contains."""
+    student_data = {'name': 'Substring Middle Name', 'age': 27}
+    add_response = client.post('/students',
+                              data=json.dumps(student_data),
+                              content_type='application/json')
+    assert add_response.status_code == 201
+
+    # Default search matches name prefixes only
+    response = client.get('/students/name/Middle')
+    assert response.status_code == 404
+
+    response = client.get('/students/name/Middle?match=contains')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert any(student['name'] == 'Substring Middle Name' for student in data)
+
+def test_search_students_by_name_special_characters(client):
+    """Test that regex metacharacters in a search are matched literally."""
+    response = client.get('/students/name/.*')
+    assert response.status_code == 404
+
+    response = client.get('/students/name/a+b?match=contains')
+    assert response.status_code == 404
+
+def test_search_students_by_name_too_long(client):
+    """Test that overly long search names are rejected."""
+    response = client.get('/students/name/' + 'a' * 129)
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert 'error' in data
+
 def test_no_json_data(client):
     """Test POST request without proper JSON content type."""
     # Send data without application/json content type
@@ -256,6 +587,67 @@ def test_empty_json_request(client):
     data = json.loads(response.data)
     assert 'error' in data
 
+def test_data_errors_return_500(client, monkeypatch):
+    """Test that data-layer failures surface as 500 instead of fallback data."""
+    def fail(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(app_module, 'delete_student', fail)
+    monkeypatch.setattr(app_module, 'search_students_by_name', fail)
+
+    response = client.delete('/students/1')
+    assert response.status_code == 500
+    assert 'error' in json.loads(response.data)
+
+    response = client.get('/students/name/Alice')
+    assert response.status_code == 500
+    assert 'error' in json.loads(response.data)
+
+    class FailingCollection:
+        def find_one(self, *args, **kwargs):
+            raise RuntimeError("database unavailable")
+
+        def estimated_document_count(self):
+            raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(app_module, 'DB_CONNECTED', True)
+    monkeypatch.setattr(app_module, 'students_collection', FailingCollection())
+    response = client.get('/students/507f1f77bcf86cd799439011')
+    assert response.status_code == 500
+    assert 'error' in json.loads(response.data)
+
+    # A failed count must not be replaced by (and cached as) the sample data count
+    response = client.get('/')
+    assert response.status_code == 500
+    assert 'total_students' not in json.loads(response.data)
+
+def test_json_datetime_format_matches_flask_default():
+    """Test that datetimes keep Flask's default HTTP-date JSON format."""
+    from datetime import datetime
+    from flask.json.provider import DefaultJSONProvider
+
+    payload = {'created_at': datetime(2026, 10, 15, 22, 10, 29)}
+    expected = json.loads(DefaultJSONProvider(app).dumps(payload))
+    assert json.loads(app.json.dumps(payload)) == expected
+    assert expected['created_at'] == 'Thu, 15 Oct 2026 22:10:29 GMT'
+
+def test_failed_connect_is_retried(monkeypatch):
+    """Test that a failed MongoDB connect with MONGO_URI set is retried later."""
+    for name in ('client', 'db', 'students_collection', 'DB_CONNECTED', '_next_connect_attempt'):
+        monkeypatch.setattr(app_module, name, getattr(app_module, name))
+    monkeypatch.setattr(app_module, '_db_initialized', False)
+    monkeypatch.setattr(app_module, 'MONGO_URI', 'mongodb://example.invalid')
+    monkeypatch.setattr(app_module, 'DB_RETRY_INTERVAL', 0)
+
+    results = [(None, None, None, False), ('client', 'db', 'collection', True)]
+    monkeypatch.setattr(app_module, 'connect_to_mongodb', lambda: results.pop(0))
+
+    assert _get_client() is None
+    assert app_module.DB_CONNECTED is False
+    assert _get_client() == 'client'
+    assert app_module.DB_CONNECTED is True
+    assert results == []
+
 def test_404_endpoint(client):
     """Test 404 error handling."""
     response = client.get('/nonexistent')